@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Keep the suite away from the checked-in tasks.db; must run before main is
+# imported, since the engine resolves its file path at creation.
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="tasks-test-"), "tasks.db"
+)
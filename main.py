@@ -13,33 +13,104 @@ uvicorn task_manager_api:app --reload
 ```
 """
 
-from __future__ import annotations
-
+import asyncio
 import enum
-import random
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
-from typing import List, Optional
-
-from fastapi import Depends, FastAPI, HTTPException, Path, Query, Request, status
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from sqlalchemy import Column, DateTime, Integer, String, create_engine
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Set
+
+from fastapi import Body, Depends, FastAPI, HTTPException, Path, Query, Request, status
+from fastapi.responses import (
+    JSONResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend, Value
+from fastapi_cache.coder import Coder
+from fastapi_cache.decorator import cache
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    TypeDecorator,
+    event,
+    func,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # ---------------------------------------------------------------------------
 # Database setup
 # ---------------------------------------------------------------------------
-DATABASE_URL = "sqlite:///./tasks.db"
-
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///./tasks.db")
+
+engine = create_async_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    query_cache_size=1200,
+)
+SessionLocal = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False
 )
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _):
+    """Use WAL journaling so commits append instead of rewriting the journal."""
+
+    # Stop the driver from emitting its own BEGIN; see _begin_transaction.
+    dbapi_conn.isolation_level = None
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    cursor.close()
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _begin_transaction(conn):
+    """Emit BEGIN ourselves so SAVEPOINTs work and writers can lock early.
+
+    Connections tagged with the ``sqlite_immediate`` execution option start
+    with ``BEGIN IMMEDIATE``, taking the write lock before the first read.
+    """
+
+    if conn.get_execution_options().get("sqlite_immediate"):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        conn.exec_driver_sql("BEGIN")
+
 
 Base = declarative_base()
 
+# Timestamps are computed by SQLite inside the INSERT/UPDATE itself. The
+# trailing "000" pads %f to microseconds so stored values share the
+# ``%Y-%m-%d %H:%M:%S.%f`` format SQLAlchemy uses for bound datetimes and
+# compare correctly against them.
+SQL_UTCNOW_FORMAT = "%Y-%m-%d %H:%M:%f000"
+
 
 # ---------------------------------------------------------------------------
 # Model definitions
@@ -51,23 +122,45 @@ class TaskStatus(str, enum.Enum):
     completed = "completed"
 
 
+class TaskStatusType(TypeDecorator):
+    """Store :class:`TaskStatus` as a one-byte integer code in SQLite."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    codes = {TaskStatus.running: 0, TaskStatus.completed: 1}
+    statuses = {code: status for status, code in codes.items()}
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.codes[TaskStatus(value)]
+
+    def process_result_value(self, value, dialect):
+        # int() also accepts the "0"/"1" text kept by older TEXT columns.
+        return None if value is None else self.statuses[int(value)]
+
+
 class Task(Base):
     """SQLAlchemy ORM model representing a Unix-style "process"."""
 
     __tablename__ = "tasks"
+    # Serve ``[WHERE status = ?] ORDER BY created_at DESC`` without a sort step.
+    __table_args__ = (
+        Index("ix_tasks_status_created", "status", "created_at"),
+        Index("ix_tasks_created", "created_at"),
+    )
 
     id: int = Column(Integer, primary_key=True, index=True)  # Unix-like PID
     name: str = Column(String, nullable=False)
     priority: int = Column(Integer, default=3)  # 0 (low) – 5 (high)
     owner: str = Column(String, nullable=False)
     command: str = Column(String, nullable=False)
-    status: str = Column(String, default=TaskStatus.running.value)
-    created_at: datetime = Column(DateTime, default=datetime.utcnow)
-    updated_at: datetime | None = Column(DateTime, nullable=True)
-
-
-# Create DB schema (in production prefer migrations)
-Base.metadata.create_all(bind=engine)
+    status: TaskStatus = Column(TaskStatusType, default=TaskStatus.running)
+    created_at: datetime = Column(
+        DateTime, default=func.strftime(SQL_UTCNOW_FORMAT, "now")
+    )
+    updated_at: Optional[datetime] = Column(
+        DateTime, onupdate=func.strftime(SQL_UTCNOW_FORMAT, "now"), nullable=True
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -100,24 +193,56 @@ class TaskOut(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ---------------------------------------------------------------------------
 # Application instance
 # ---------------------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Prepare the database, PID allocator and response cache; close the pool."""
+
+    global _write_lock
+    _write_lock = asyncio.Lock()  # bound to this event loop
+
+    # Create DB schema (in production prefer migrations).
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that already exist, so add new indexes to
+        # databases created by earlier versions explicitly.
+        for index in Task.__table__.indexes:
+            await conn.run_sync(index.create, checkfirst=True)
+        # Earlier versions stored the status label itself; convert to codes.
+        await conn.exec_driver_sql(
+            "UPDATE tasks SET status = CASE status WHEN 'running' THEN 0 ELSE 1 END "
+            "WHERE status IN ('running', 'completed')"
+        )
+        _load_used_pids(await conn.scalars(select(Task.id)))
+
+    # Back the response cache with a per-process in-memory store.
+    FastAPICache.init(BoundedInMemoryBackend())
+    yield
+    # aiosqlite runs each connection on a non-daemon thread; close them so
+    # the interpreter can exit.
+    await engine.dispose()
+
+
 app = FastAPI(
     title="Unix‑Inspired Task Manager API",
     description=(
         "This API simulates Unix‑style process management.\n\n"
         "* **Create** tasks (`POST /tasks`)\n"
+        "* **Bulk-create** tasks in one transaction (`POST /tasks/bulk`)\n"
         "* **List / filter** tasks (`GET /tasks`)\n"
+        "* **Export** all tasks as a streamed array (`GET /tasks/export`)\n"
         "* **Mark** tasks as completed (`PATCH /tasks/{id}`)"
     ),
     version="1.3.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 
@@ -138,37 +263,221 @@ async def db_exception_handler(_: Request, exc: SQLAlchemyError):
 # Dependencies
 # ---------------------------------------------------------------------------
 
-def get_db() -> Session:
+async def get_db() -> AsyncSession:
     """Provide a database session per request and guarantee its closure."""
 
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+# SQLite admits one writer at a time. Queue writers here instead of letting
+# pooled connections race for the lock and back off in SQLite's busy handler,
+# which sleeps far longer than a write takes.
+_write_lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def write_transaction(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Group writes into one transaction that commits on exit.
+
+    Outermost use waits for this process's write lock, then opens a
+    ``BEGIN IMMEDIATE`` transaction; nested use (the session already in a
+    transaction) opens a SAVEPOINT instead, so an inner failure rolls back
+    only its own writes.
+    """
+
+    if db.in_transaction():
+        async with db.begin_nested():
+            yield db
+    else:
+        async with _write_lock, db.begin():
+            await db.connection(execution_options={"sqlite_immediate": True})
+            yield db
 
 
 # ---------------------------------------------------------------------------
 # Utility helpers
 # ---------------------------------------------------------------------------
 PID_MIN, PID_MAX = 1000, 99999
+PID_MAX_ATTEMPTS = 5
+BULK_MAX_TASKS = 1000  # matches the GET /tasks page size cap
 
+_last_pid = PID_MIN - 1
+_used_pids: Set[int] = set()
+_pid_lock = threading.Lock()
 
-def _generate_unique_pid(db: Session, max_attempts: int = 5) -> int:
-    """Generate a PID that does not collide with existing DB rows.
+
+def _load_used_pids(pids: Iterable[int]) -> None:
+    """Record the PIDs already on disk and resume allocation after the largest."""
+
+    global _last_pid
+    with _pid_lock:
+        _used_pids.clear()
+        _used_pids.update(pid for pid in pids if PID_MIN <= pid <= PID_MAX)
+        _last_pid = max(_used_pids, default=PID_MIN - 1)
+
+
+def _allocate_pids(count: int) -> List[int]:
+    """Reserve *count* free PIDs in sequence, wrapping to ``PID_MIN`` like Unix.
+
+    PIDs in use are tracked in process, so allocation costs no DB round-trip.
+    Worker processes share no state and count up from the same PID, so each
+    may pick PIDs another has already written. Callers detect that with
+    ``ON CONFLICT DO NOTHING`` and then call :func:`_absorb_used_pids`.
 
     Raises:
-        HTTPException 500 if uniqueness cannot be guaranteed after *max_attempts*.
+        HTTPException 500 if the PID space cannot hold *count* more tasks.
+    """
+
+    global _last_pid
+    with _pid_lock:
+        if count > (PID_MAX - PID_MIN + 1) - len(_used_pids):
+            raise HTTPException(
+                status_code=500,
+                detail="Unable to allocate unique PID – try again later.",
+            )
+
+        pids: List[int] = []
+        while len(pids) < count:
+            _last_pid = PID_MIN if _last_pid >= PID_MAX else _last_pid + 1
+            if _last_pid not in _used_pids:
+                _used_pids.add(_last_pid)
+                pids.append(_last_pid)
+        return pids
+
+
+def _absorb_used_pids(pids: Iterable[int]) -> None:
+    """Merge PIDs written by other worker processes and jump past the newest.
+
+    Callers reload *pids* from the table after a collision while holding the
+    ``BEGIN IMMEDIATE`` write lock, so the set stays complete until they
+    commit and the next allocation cannot collide again.
     """
 
-    for _ in range(max_attempts):
-        pid = random.randint(PID_MIN, PID_MAX)
-        if db.query(Task).filter(Task.id == pid).first() is None:
-            return pid
-    raise HTTPException(
-        status_code=500,
-        detail="Unable to allocate unique PID – try again later.",
+    global _last_pid
+    with _pid_lock:
+        new = {pid for pid in pids if PID_MIN <= pid <= PID_MAX} - _used_pids
+        _used_pids.update(new)
+        _last_pid = max(_last_pid, max(new, default=_last_pid))
+
+
+def _next_pid() -> int:
+    """Reserve a single free PID; see :func:`_allocate_pids`."""
+
+    return _allocate_pids(1)[0]
+
+
+def _release_pids(pids: Iterable[int]) -> None:
+    """Return reserved PIDs that never reached the database to the free pool."""
+
+    with _pid_lock:
+        _used_pids.difference_update(pids)
+
+
+@contextmanager
+def _pid_reservation() -> Iterator[Set[int]]:
+    """Collect PIDs reserved by a write and release them if it fails.
+
+    Callers add each PID they allocate and discard the ones found taken by
+    another worker, which must stay marked as used.
+    """
+
+    reserved: Set[int] = set()
+    try:
+        yield reserved
+    except BaseException:
+        _release_pids(reserved)
+        raise
+
+
+# Built once at import; per-request filters and paging are layered on top and
+# resolve to the same entries in SQLAlchemy's compiled-statement cache.
+# ``id`` breaks ties between tasks created in the same millisecond (a bulk
+# batch shares one timestamp), giving pages a total order.
+LIST_TASKS_STMT = select(Task.__table__).order_by(
+    Task.created_at.desc(), Task.id.desc()
+)
+
+
+TASKS_CACHE_NAMESPACE = "tasks"
+TASKS_CACHE_TTL = 2  # seconds
+TASKS_CACHE_MAX_ENTRIES = 256
+
+
+class BoundedInMemoryBackend(InMemoryBackend):
+    """In-memory cache store that cannot grow without bound.
+
+    The stock backend only drops an expired entry when that key is read
+    again, and keeps one store shared by every instance. This one owns its
+    store, sweeps expired entries on every write and evicts the oldest
+    entry once *max_entries* is reached.
+    """
+
+    def __init__(self, max_entries: int = TASKS_CACHE_MAX_ENTRIES) -> None:
+        self._store = {}
+        self._lock = asyncio.Lock()
+        self._max_entries = max_entries
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        async with self._lock:
+            now = self._now
+            for stale in [k for k, v in self._store.items() if v.ttl_ts < now]:
+                del self._store[stale]
+            self._store.pop(key, None)
+            if len(self._store) >= self._max_entries:
+                del self._store[next(iter(self._store))]  # oldest insertion
+            self._store[key] = Value(value, now + (expire or 0))
+
+
+class RawJSONCoder(Coder):
+    """Cache rendered JSON responses as their body bytes."""
+
+    @classmethod
+    def encode(cls, value: Response) -> bytes:
+        return value.body
+
+    @classmethod
+    def decode(cls, value: bytes) -> Response:
+        return Response(content=value, media_type="application/json")
+
+
+def _query_cache_key(func, namespace: str = "", *, kwargs: dict, **_) -> str:
+    """Key cached responses on the endpoint's validated query parameters.
+
+    Unknown query parameters never reach *kwargs*, so they cannot mint new
+    cache entries; the per-request ``db`` session is left out as well.
+    """
+
+    params = "&".join(
+        f"{name}={value}" for name, value in sorted(kwargs.items()) if name != "db"
     )
+    return f"{FastAPICache.get_prefix()}:{namespace}:{func.__name__}?{params}"
+
+
+async def _invalidate_task_listings() -> None:
+    """Drop cached `GET /tasks` pages after a write."""
+
+    await FastAPICache.clear(namespace=TASKS_CACHE_NAMESPACE)
+
+
+STREAM_CHUNK_ROWS = 500
+
+
+async def _stream_json_array(stmt) -> AsyncIterator[bytes]:
+    """Yield the rows of *stmt* as a JSON array, one chunk per fetched batch.
+
+    Uses its own connection: the request's session is closed before a
+    streaming body is sent.
+    """
+
+    yield b"["
+    separator = b""
+    async with engine.connect() as conn:
+        result = await conn.stream(stmt)
+        async for rows in result.mappings().partitions(STREAM_CHUNK_ROWS):
+            yield separator + b",".join(orjson.dumps(dict(row)) for row in rows)
+            separator = b","
+    yield b"]"
 
 
 # ---------------------------------------------------------------------------
@@ -180,18 +489,76 @@ def _generate_unique_pid(db: Session, max_attempts: int = 5) -> int:
     tags=["Tasks"],
     summary="List tasks with optional status filter",
 )
-def list_tasks(
+# Server-side cache only: list_tasks returns a Response, so the ETag and
+# Cache-Control headers fastapi-cache sets on its injected response are never
+# sent, and its If-None-Match/304 path cannot apply.
+@cache(
+    expire=TASKS_CACHE_TTL,
+    coder=RawJSONCoder,
+    key_builder=_query_cache_key,
+    namespace=TASKS_CACHE_NAMESPACE,
+)
+async def list_tasks(
     status: Optional[TaskStatus] = Query(
         None, description="Filter tasks by status (running/completed)"
     ),
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum tasks to return"),
+    offset: int = Query(0, ge=0, description="Number of tasks to skip"),
+    before: Optional[datetime] = Query(
+        None,
+        description="Only return tasks listed after this cursor "
+        "(keyset pagination; pass the last `created_at` seen)",
+    ),
+    before_id: Optional[int] = Query(
+        None,
+        description="PID of the last task seen; use together with `before` so "
+        "tasks sharing its `created_at` are not skipped",
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Return all tasks or only those with the specified *status*."""
+    """Return a page of tasks, newest first, optionally filtered by *status*."""
 
-    query = db.query(Task)
+    stmt = LIST_TASKS_STMT
     if status is not None:
-        query = query.filter(Task.status == status.value)
-    return query.order_by(Task.created_at.desc()).all()
+        stmt = stmt.where(Task.status == status)
+    if before_id is not None and before is None:
+        # A PID alone is no position in (created_at, id) order.
+        raise HTTPException(
+            status_code=422, detail="`before_id` requires `before`"
+        )
+    if before is not None and before_id is not None:
+        stmt = stmt.where(tuple_(Task.created_at, Task.id) < (before, before_id))
+    elif before is not None:
+        stmt = stmt.where(Task.created_at < before)
+    stmt = stmt.limit(limit).offset(offset)
+    result = await db.execute(stmt)
+    # Plain Core rows: no ORM instances, and no per-row TaskOut validation.
+    return ORJSONResponse([dict(row) for row in result.mappings()])
+
+
+@app.get(
+    "/tasks/export",
+    response_model=List[TaskOut],
+    tags=["Tasks"],
+    summary="Stream every task as one JSON array",
+)
+async def export_tasks(
+    status: Optional[TaskStatus] = Query(
+        None, description="Filter tasks by status (running/completed)"
+    ),
+):
+    """Return all matching tasks, newest first, without pagination.
+
+    Rows are read in index order (``ix_tasks_created`` or, when filtering,
+    ``ix_tasks_status_created``), so SQLite needs no up-front sort and the
+    array is streamed as rows arrive, with flat memory use however many tasks
+    there are. Exports bypass the listing cache.
+    """
+
+    stmt = LIST_TASKS_STMT
+    if status is not None:
+        stmt = stmt.where(Task.status == status)
+    return StreamingResponse(_stream_json_array(stmt), media_type="application/json")
 
 
 @app.post(
@@ -201,29 +568,117 @@ def list_tasks(
     tags=["Tasks"],
     summary="Create a new task",
 )
-def create_task(task: TaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):
     """Insert a new task and return the persisted record with a unique PID."""
 
-    pid = _generate_unique_pid(db)
+    # A PID taken by another worker process makes the INSERT a no-op that
+    # returns no row, so collision detection costs no extra statement; only
+    # then are the other workers' PIDs reloaded.
+    with _pid_reservation() as reserved:
+        async with write_transaction(db):
+            for _ in range(PID_MAX_ATTEMPTS):
+                pid = _next_pid()
+                reserved.add(pid)
+                result = await db.execute(
+                    sqlite_insert(Task.__table__)
+                    .values(
+                        id=pid,
+                        name=task.name,
+                        priority=task.priority,
+                        owner=task.owner,
+                        command=task.command,
+                        status=TaskStatus.running,
+                    )
+                    .on_conflict_do_nothing(index_elements=[Task.id])
+                    .returning(*Task.__table__.c)
+                )
+                row = result.mappings().first()
+                if row is not None:
+                    break
+                reserved.discard(pid)  # another worker's task; stays used
+                _absorb_used_pids(await db.scalars(select(Task.id)))
+            else:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Unable to allocate unique PID – try again later.",
+                )
+
+    await _invalidate_task_listings()
+    return dict(row)
 
-    new_task = Task(
-        id=pid,
-        name=task.name,
-        priority=task.priority,
-        owner=task.owner,
-        command=task.command,
-        status=TaskStatus.running.value,
-    )
 
-    try:
-        db.add(new_task)
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        return create_task(task, db)  # rare collision retry
+@app.post(
+    "/tasks/bulk",
+    response_model=List[TaskOut],
+    status_code=201,
+    tags=["Tasks"],
+    summary="Create many tasks in a single transaction",
+)
+async def create_tasks_bulk(
+    tasks: List[TaskCreate] = Body(
+        ...,
+        max_length=BULK_MAX_TASKS,
+        description=f"Tasks to create (at most {BULK_MAX_TASKS})",
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """Insert several tasks with one statement batch and a single commit.
+
+    PIDs are allocated in process, so the whole batch normally costs one
+    executemany INSERT ... RETURNING. Rows whose PID another worker process
+    already took are skipped by the INSERT and retried with fresh PIDs.
+    """
 
-    db.refresh(new_task)
-    return new_task
+    if not tasks:
+        return []
+
+    created: List[dict] = []
+    position: dict = {}  # PID -> index in *tasks*, to keep request order
+    pending = list(range(len(tasks)))
+
+    with _pid_reservation() as reserved:
+        async with write_transaction(db):
+            for _ in range(PID_MAX_ATTEMPTS):
+                pids = _allocate_pids(len(pending))
+                reserved.update(pids)
+                position.update(zip(pids, pending))
+                rows = [
+                    {
+                        "id": pid,
+                        "name": tasks[index].name,
+                        "priority": tasks[index].priority,
+                        "owner": tasks[index].owner,
+                        "command": tasks[index].command,
+                        "status": TaskStatus.running,
+                    }
+                    for pid, index in zip(pids, pending)
+                ]
+
+                result = await db.execute(
+                    sqlite_insert(Task.__table__)
+                    .on_conflict_do_nothing(index_elements=[Task.id])
+                    .returning(*Task.__table__.c),
+                    rows,
+                )
+                created.extend(dict(row) for row in result.mappings())
+
+                inserted = {row["id"] for row in created}
+                taken = [pid for pid in pids if pid not in inserted]
+                if not taken:
+                    break
+                reserved.difference_update(taken)  # other workers' tasks
+                _absorb_used_pids(await db.scalars(select(Task.id)))
+                pending = [position[pid] for pid in taken]
+            else:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Unable to allocate unique PID – try again later.",
+                )
+
+    created.sort(key=lambda row: position[row["id"]])
+
+    await _invalidate_task_listings()
+    return created
 
 
 @app.patch(
@@ -232,25 +687,30 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db)):
     tags=["Tasks"],
     summary="Mark a task as completed",
 )
-def complete_task(
+async def complete_task(
     task_id: int = Path(..., description="PID of the task to complete"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Set a task's *status* to `completed`.
 
     Returns **409 Conflict** if the task is already completed.
     """
 
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    if task.status == TaskStatus.completed.value:
-        raise HTTPException(status_code=409, detail="Task already completed")
-
-    task.status = TaskStatus.completed.value
-    task.updated_at = datetime.utcnow()
-
-    db.commit()
-    db.refresh(task)
-    return task
+    # One conditional UPDATE both checks and flips the status, so two
+    # concurrent PATCHes cannot both observe `running`.
+    async with write_transaction(db):
+        result = await db.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.status == TaskStatus.running)
+            .values(status=TaskStatus.completed)  # updated_at via onupdate
+            .returning(*Task.__table__.c)
+        )
+        row = result.mappings().first()
+        if row is None:
+            # Nothing updated: tell "missing" apart from "already completed".
+            if await db.scalar(select(1).where(Task.id == task_id)) is None:
+                raise HTTPException(status_code=404, detail="Task not found")
+            raise HTTPException(status_code=409, detail="Task already completed")
+
+    await _invalidate_task_listings()
+    return dict(row)
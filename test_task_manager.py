@@ -0,0 +1,277 @@
+"""Tests for the Unix-inspired task manager API.
+
+Each test runs the app against a fresh SQLite file in a temporary directory.
+"""
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+
+TASK = {"name": "Daily backup", "owner": "admin", "command": "rsync -avz /data /backup"}
+
+
+@pytest.fixture
+def db_path():
+    """Start every test from an empty database file (see conftest.py)."""
+
+    path = Path(main.engine.url.database)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    with TestClient(main.app) as client:
+        yield client
+
+
+def run_sql(db_path, sql, params=()):
+    """Write to the database behind the app's back, like another worker."""
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.executemany(sql, params) if params else conn.execute(sql)
+        conn.commit()
+
+
+def insert_raw(db_path, *pids):
+    run_sql(
+        db_path,
+        "INSERT INTO tasks (id, name, owner, command, status, created_at) "
+        "VALUES (?, 'other', 'root', 'true', 0, '2020-01-01 00:00:00.000000')",
+        [(pid,) for pid in pids],
+    )
+
+
+def fail_inserts_named(db_path, name):
+    run_sql(
+        db_path,
+        f"CREATE TRIGGER fail_insert BEFORE INSERT ON tasks WHEN NEW.name = '{name}' "
+        "BEGIN SELECT RAISE(ABORT, 'forced failure'); END",
+    )
+
+
+# ---------------------------------------------------------------------------
+# PID allocator
+# ---------------------------------------------------------------------------
+def test_allocate_pids_wraps_and_skips_used():
+    main._load_used_pids([main.PID_MIN, main.PID_MAX])
+
+    assert main._allocate_pids(2) == [main.PID_MIN + 1, main.PID_MIN + 2]
+
+
+def test_allocate_pids_ignores_out_of_range_ids():
+    main._load_used_pids([1, main.PID_MAX + 1])
+
+    assert main._next_pid() == main.PID_MIN
+
+
+def test_allocate_pids_rejects_exhausted_space():
+    main._load_used_pids(range(main.PID_MIN, main.PID_MAX))
+
+    assert main._allocate_pids(1) == [main.PID_MAX]
+    with pytest.raises(HTTPException) as excinfo:
+        main._allocate_pids(1)
+    assert excinfo.value.status_code == 500
+
+
+def test_create_skips_past_pids_written_by_other_workers(client, db_path):
+    other_worker_pids = range(main.PID_MIN, main.PID_MIN + 10)
+    insert_raw(db_path, *other_worker_pids)
+
+    response = client.post("/tasks", json=TASK)
+
+    assert response.status_code == 201
+    assert response.json()["id"] == main.PID_MIN + 10
+    assert main._used_pids >= set(other_worker_pids)
+
+
+def test_failed_create_releases_reserved_pid(client, db_path):
+    fail_inserts_named(db_path, "boom")
+
+    assert client.post("/tasks", json={**TASK, "name": "boom"}).status_code == 500
+    assert main._used_pids == set()
+
+    created = client.post("/tasks", json=TASK).json()
+    assert main._used_pids == {created["id"]}
+
+
+def test_failed_bulk_create_releases_reserved_pids(client, db_path):
+    fail_inserts_named(db_path, "boom")
+
+    response = client.post("/tasks/bulk", json=[TASK, {**TASK, "name": "boom"}])
+
+    assert response.status_code == 500
+    assert main._used_pids == set()
+    assert client.get("/tasks").json() == []
+
+
+def test_bulk_create_retries_pids_taken_by_other_workers(client, db_path):
+    insert_raw(db_path, main.PID_MIN + 1)
+
+    names = ["first", "second", "third"]
+    response = client.post("/tasks/bulk", json=[{**TASK, "name": n} for n in names])
+
+    assert response.status_code == 201
+    assert [task["name"] for task in response.json()] == names
+    # "second" drew the taken PID and was retried with the next free one.
+    assert [task["id"] for task in response.json()] == [
+        main.PID_MIN,
+        main.PID_MIN + 3,
+        main.PID_MIN + 2,
+    ]
+    assert main.PID_MIN + 1 in main._used_pids
+
+
+# ---------------------------------------------------------------------------
+# Listing cache
+# ---------------------------------------------------------------------------
+def cached_keys():
+    return list(main.FastAPICache.get_backend()._store)
+
+
+def test_list_cache_ignores_unknown_query_params(client):
+    for nonce in range(5):
+        client.get("/tasks", params={"limit": 10, "nonce": nonce})
+
+    assert len(cached_keys()) == 1
+
+
+def test_list_cache_is_cleared_by_writes(client):
+    assert client.get("/tasks").json() == []
+
+    created = client.post("/tasks", json=TASK).json()
+    assert [task["id"] for task in client.get("/tasks").json()] == [created["id"]]
+
+    client.post("/tasks/bulk", json=[TASK, TASK])
+    assert len(client.get("/tasks").json()) == 3
+
+    client.patch(f"/tasks/{created['id']}")
+    running = client.get("/tasks", params={"status": "running"}).json()
+    assert created["id"] not in [task["id"] for task in running]
+
+
+@pytest.mark.asyncio
+async def test_bounded_cache_backend_sweeps_and_evicts():
+    backend = main.BoundedInMemoryBackend(max_entries=2)
+    await backend.set("stale", b"x", expire=-1)
+    await backend.set("a", b"a", expire=60)
+    assert list(backend._store) == ["a"]
+
+    await backend.set("b", b"b", expire=60)
+    await backend.set("c", b"c", expire=60)
+    assert list(backend._store) == ["b", "c"]
+
+
+# ---------------------------------------------------------------------------
+# Listing order and pagination
+# ---------------------------------------------------------------------------
+def test_keyset_cursor_pages_through_tasks_sharing_created_at(client):
+    batch = client.post("/tasks/bulk", json=[TASK] * 5).json()
+    assert len({task["created_at"] for task in batch}) == 1
+
+    first = client.get("/tasks", params={"limit": 3}).json()
+    last = first[-1]
+    second = client.get(
+        "/tasks",
+        params={"limit": 3, "before": last["created_at"], "before_id": last["id"]},
+    ).json()
+
+    pids = [task["id"] for task in first + second]
+    assert pids == sorted((task["id"] for task in batch), reverse=True)
+
+
+def test_offset_pages_do_not_overlap(client):
+    client.post("/tasks/bulk", json=[TASK] * 5)
+
+    pages = [
+        client.get("/tasks", params={"limit": 2, "offset": offset}).json()
+        for offset in (0, 2, 4)
+    ]
+
+    pids = [task["id"] for page in pages for task in page]
+    assert len(pids) == len(set(pids)) == 5
+
+
+def test_before_id_without_before_is_rejected(client):
+    response = client.get("/tasks", params={"before_id": main.PID_MAX})
+
+    assert response.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# Completing tasks
+# ---------------------------------------------------------------------------
+def test_complete_task_then_conflict(client):
+    created = client.post("/tasks", json=TASK).json()
+
+    response = client.patch(f"/tasks/{created['id']}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert response.json()["updated_at"] is not None
+
+    response = client.patch(f"/tasks/{created['id']}")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Task already completed"
+
+
+def test_complete_unknown_task_is_not_found(client):
+    response = client.patch(f"/tasks/{main.PID_MAX}")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Task not found"
+
+
+# ---------------------------------------------------------------------------
+# Upgrading databases written by earlier versions
+# ---------------------------------------------------------------------------
+LEGACY_SCHEMA = """
+CREATE TABLE tasks (
+    id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    priority INTEGER,
+    owner VARCHAR NOT NULL,
+    command VARCHAR NOT NULL,
+    status VARCHAR,
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE INDEX ix_tasks_id ON tasks (id);
+"""
+
+
+def test_startup_converts_legacy_status_labels(db_path):
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO tasks (id, name, priority, owner, command, status, "
+            "created_at) VALUES (?, 'old', 3, 'root', 'true', ?, ?)",
+            [
+                (4242, "running", "2024-01-01 00:00:00.000000"),
+                (4243, "completed", "2024-01-02 00:00:00.000000"),
+            ],
+        )
+        conn.commit()
+
+    with TestClient(main.app) as client:
+        running = client.get("/tasks", params={"status": "running"}).json()
+        completed = client.get("/tasks", params={"status": "completed"}).json()
+        assert [task["id"] for task in running] == [4242]
+        assert [task["id"] for task in completed] == [4243]
+
+        assert client.patch("/tasks/4242").json()["status"] == "completed"
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        # The legacy VARCHAR column keeps text affinity, so codes read back as
+        # '0'/'1'; SQLite applies that affinity to comparisons too.
+        stored = dict(conn.execute("SELECT id, CAST(status AS INTEGER) FROM tasks"))
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(tasks)")}
+    assert stored == {4242: 1, 4243: 1}
+    assert {"ix_tasks_status_created", "ix_tasks_created"} <= indexes